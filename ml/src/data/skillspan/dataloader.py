@@ -4,11 +4,28 @@
     (https://aclanthology.org/2022.naacl-main.366).
 """
 
-from datasets import load_dataset, concatenate_datasets
+import os
+import shutil
+from datasets import load_dataset, load_from_disk, concatenate_datasets
+
+# local Arrow copy of the concatenated splits, written on the first load
+SKILLSPAN_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
 
 # load skillspan dataset with official splits (train / validation / test)
 def load_skillspan_data():
+    # state.json is written by save_to_disk, so its presence means a complete cache
+    if os.path.isfile(os.path.join(SKILLSPAN_CACHE_DIR, "state.json")):
+        return load_from_disk(SKILLSPAN_CACHE_DIR)
+
     splitted_data = load_dataset("jjzha/skillspan")
     data = concatenate_datasets([splitted_data['train'], splitted_data['validation'], splitted_data['test']])
 
+    # save to a temporary directory and move it into place, so an interrupted run never leaves a broken cache
+    tmp_dir = SKILLSPAN_CACHE_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    data.save_to_disk(tmp_dir)
+
+    shutil.rmtree(SKILLSPAN_CACHE_DIR, ignore_errors=True)
+    os.replace(tmp_dir, SKILLSPAN_CACHE_DIR)
+
     return data
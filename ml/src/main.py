@@ -6,25 +6,28 @@ from src.utils.input_to_text import extract_text
 from fastapi import FastAPI, UploadFile, File
 import os
 import tempfile
+import functools
+import contextlib
 from pydantic import BaseModel
 import re
 
 CONF_THRESHOLD = 0.3
 
-# load model
-_loaded = load_skillner()
-_skillner = _loaded["model"]
-_tokenizer = _loaded["tokenizer"]
+# load model and build the skill extraction pipeline once, on first use
+@functools.lru_cache(maxsize=1)
+def _get_pipeline():
+    loaded = load_skillner()
+    ner = build_skill_pipeline(model=loaded["model"], tokenizer=loaded["tokenizer"])
 
-# Building skill extraction pipeline
-pipeline = build_skill_pipeline(model=_skillner, tokenizer=_tokenizer)
+    return ner, loaded["tokenizer"]
 
 def run_main_pipeline(filepath, conf_threshold=CONF_THRESHOLD):
     # Convert file to text for input
     text = extract_text(filepath=filepath)
 
     # Extract skills from input
-    extracted_skills = extract_skills(text, pipeline, _tokenizer)
+    ner, tokenizer = _get_pipeline()
+    extracted_skills = extract_skills(text, ner, tokenizer)
 
     print("EXTRACTED_SKILLS_LEN =", len(extracted_skills))
     print("EXTRACTED_SKILLS_SAMPLE =", extracted_skills[:10])
@@ -59,7 +62,13 @@ def run_main_pipeline(filepath, conf_threshold=CONF_THRESHOLD):
     return list(dedup.values())
 
 
-app = FastAPI()
+# load the model once at startup so the first CV request doesn't block the event loop on it
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    _get_pipeline()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 class OpportunityRequest(BaseModel):
     description: str
@@ -29,11 +29,22 @@ import tensorflow as tf
 import numpy as np
 
 from data.skillspan.dataloader import load_skillspan_data
-from utils.encoder import tokenize_and_align_labels
+from utils.encoder import batch_tokenize_and_align_labels, IGNORE_LABEL_ID
 from utils.dataset import make_dataset
 from sklearn.model_selection import train_test_split
 from transformers import AutoTokenizer, TFAutoModelForTokenClassification
 
+# train in mixed precision (float16 compute, float32 variables)
+tf.keras.mixed_precision.set_global_policy('mixed_float16')
+
+# softmax cross-entropy on float32 logits (the classifier head emits float16 logits under mixed_float16)
+class Float32SparseCategoricalCrossentropy(tf.keras.losses.SparseCategoricalCrossentropy):
+    def call(self, y_true, y_pred):
+        return super().call(y_true, tf.cast(y_pred, tf.float32))
+
+# let XLA auto-cluster and fuse ops outside of the compiled train step as well
+tf.config.optimizer.set_jit("autoclustering")
+
 # load data
 data = load_skillspan_data()
 
@@ -49,32 +60,37 @@ label_list = ["O", "B-SKILL", "I-SKILL"]
 label2id = {l: i for i, l in enumerate(label_list)}
 id2label = {i: l for l, i in label2id.items()}
 
+# data-parallel training over all visible GPUs (gradients are all-reduced every step)
+strategy = tf.distribute.MirroredStrategy()
+print("NUMBER OF REPLICAS:", strategy.num_replicas_in_sync)
+
+# batch size per replica -> global batch size
+BATCH_SIZE = 16
+global_batch_size = BATCH_SIZE * strategy.num_replicas_in_sync
+
 # load base model
-tokenizer = AutoTokenizer.from_pretrained("jjzha/jobbert-base-cased")
-model = TFAutoModelForTokenClassification.from_pretrained("jjzha/jobbert-base-cased",
-                                                          num_labels=len(label_list),
-                                                          id2label=id2label,
-                                                          label2id=label2id)
-
-# encode data
-train_encoded = [
-    tokenize_and_align_labels(tokenizer, tokens, tags)
-    for tokens, tags in zip(train_X, train_Y)
-]
-
-val_encoded = [
-    tokenize_and_align_labels(tokenizer, tokens, tags)
-    for tokens, tags in zip(val_X, val_Y)
-]
-
-train_data = make_dataset(train_encoded)
-val_data = make_dataset(val_encoded)
-
-# callbacks
-checkpoint = tf.keras.callbacks.ModelCheckpoint(filepath="ML Model\\models\\trained_models\\jobify_jobbert_v1.keras",
+tokenizer = AutoTokenizer.from_pretrained("jjzha/jobbert-base-cased", use_fast=True)
+
+with strategy.scope():
+    model = TFAutoModelForTokenClassification.from_pretrained("jjzha/jobbert-base-cased",
+                                                              num_labels=len(label_list),
+                                                              id2label=id2label,
+                                                              label2id=label2id)
+print("MODEL DTYPE POLICY:", model.dtype_policy.name)
+
+# encode data (one batched tokenizer call per split, parallelized inside the fast tokenizer)
+train_encoded = batch_tokenize_and_align_labels(tokenizer, train_X, train_Y)
+val_encoded = batch_tokenize_and_align_labels(tokenizer, val_X, val_Y)
+
+train_data = make_dataset(train_encoded, batch_size=global_batch_size, shuffle=True)
+val_data = make_dataset(val_encoded, batch_size=global_batch_size)
+
+# callbacks (checkpoints only dump the weights, the full model is saved once after training)
+CHECKPOINT_PATH = "ML Model\\models\\trained_models\\jobify_jobbert_v1.weights.h5"
+checkpoint = tf.keras.callbacks.ModelCheckpoint(filepath=CHECKPOINT_PATH,
                                                     monitor='val_loss',
                                                     save_best_only=True,
-                                                    save_weights_only=False,
+                                                    save_weights_only=True,
                                                     mode='min',
                                                     verbose=1)
 
@@ -85,16 +101,23 @@ reduce_lrate = tf.keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0
 
 # compile and train the model
 print("STARTING COMPILING PROCESS:")
-model.compile(optimizer= tf.keras.optimizers.Adam(learning_rate=5e-05, epsilon=1e-08, beta_1=0.9, beta_2=0.999),
-              loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
-              metrics=[
-                  tf.keras.metrics.Accuracy(),
-                  tf.keras.metrics.Precision(),
-                  tf.keras.metrics.Recall()])
+with strategy.scope():
+    model.compile(optimizer= tf.keras.mixed_precision.LossScaleOptimizer(tf.keras.optimizers.Adam(learning_rate=5e-05, epsilon=1e-08, beta_1=0.9, beta_2=0.999)),
+                  loss=Float32SparseCategoricalCrossentropy(from_logits=True, ignore_class=IGNORE_LABEL_ID),
+                  metrics=[
+                      tf.keras.metrics.Accuracy(),
+                      tf.keras.metrics.Precision(),
+                      tf.keras.metrics.Recall()],
+                  jit_compile=True)
 print("DONE COMPILING ✅")
 
 print("STARTING TRAINING PROCESS: ")
 history = model.fit(train_data, validation_data=val_data, epochs=30, verbose=1, callbacks=[checkpoint, reduce_lrate, stop_training])
 print("DONE TRAINING ✅")
+# EarlyStopping only restores the best weights when it stops early, so reload the best checkpoint
+model.load_weights(CHECKPOINT_PATH)
+model.save_pretrained("ML Model\\models\\trained_models\\jobify_jobbert_v1")
+tokenizer.save_pretrained("ML Model\\models\\trained_models\\jobify_jobbert_v1")
+print("MODEL SAVED ✅")
 np.savez("ML\\models\\training_history\\training_history.npz", **history.history)
 print("HISTORY SAVED ✅")
\ No newline at end of file
@@ -16,15 +16,49 @@ Task:
 - Token classification (Named Entity Recognition for skills)
 
 Usage:
-- Inference only
-- Evaluation and comparison against custom-trained models
+- Inference only (exported to ONNX and quantized to int8)
+- Evaluation and comparison against custom-trained models (the reported
+  SkillNER metrics were measured on the original FP32 model, not on the
+  int8 export)
 """
 
-from transformers import AutoTokenizer, AutoModelForTokenClassification
+import os
+import shutil
+
+from transformers import AutoTokenizer
+from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+# int8 ONNX export of ihk/skillner, built on first load and reused afterwards
+SKILLNER_INT8_DIR = os.path.join(os.path.dirname(__file__), "trained_models", "skillner-int8")
+SKILLNER_INT8_FILE = "model_quantized.onnx"
+
+# export the model to ONNX and dynamically quantize its weights to int8 (faster CPU inference)
+def quantize_skillner(save_dir=SKILLNER_INT8_DIR):
+    # build everything in a temporary directory and move it into place at the end,
+    # so an interrupted run never leaves a half-written model behind
+    tmp_dir = save_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    tokenizer = AutoTokenizer.from_pretrained("ihk/skillner")
+    model = ORTModelForTokenClassification.from_pretrained("ihk/skillner", export=True, provider="CPUExecutionProvider")
+
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(save_dir=tmp_dir, quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False))
+    model.config.save_pretrained(tmp_dir)
+    tokenizer.save_pretrained(tmp_dir)
+
+    shutil.rmtree(save_dir, ignore_errors=True)
+    os.replace(tmp_dir, save_dir)
 
 # load model
 def load_skillner():
-    tokenizer = AutoTokenizer.from_pretrained("ihk/skillner")
-    model = AutoModelForTokenClassification.from_pretrained("ihk/skillner")
+    if not os.path.isfile(os.path.join(SKILLNER_INT8_DIR, SKILLNER_INT8_FILE)):
+        quantize_skillner()
+
+    tokenizer = AutoTokenizer.from_pretrained(SKILLNER_INT8_DIR)
+    model = ORTModelForTokenClassification.from_pretrained(SKILLNER_INT8_DIR,
+                                                           file_name=SKILLNER_INT8_FILE,
+                                                           provider="CPUExecutionProvider")
 
     return {'tokenizer': tokenizer, 'model': model}
@@ -1,19 +1,29 @@
+import os
+import numpy as np
+import torch
 from transformers import pipeline
-from src.utils.skills_postprocessing import merge_bio_entities
+from src.utils.skills_postprocessing import merge_bio_entities, predictions_to_entities
+
+# inputs longer than this skip the pipeline's per-item preprocess/forward/postprocess wrappers (see predict_entities_fast)
+FAST_PATH_MIN_CHARS = 2000
 
 # Exctract skills from input (input text -> model -> skills)
-def build_skill_pipeline(model, tokenizer):
+def build_skill_pipeline(model, tokenizer, batch_size=16):
+    # use every core for the torch ops around the model (tensor conversion, softmax, ...)
+    torch.set_num_threads(os.cpu_count())
+
     ner = pipeline(
         task="token-classification",
         model=model,
-        tokenizer = tokenizer
+        tokenizer = tokenizer,
+        batch_size=batch_size
     )
 
     return ner
 
 
 def extract_skills(text, ner_pipeline, tokenizer, max_no_special=510):
-    all_entities = []
+    segments = []
 
     # 1) line-by-line
     for line in text.split("\n"):
@@ -21,16 +31,56 @@ def extract_skills(text, ner_pipeline, tokenizer, max_no_special=510):
         if not line:
             continue
 
-        # 2) if the line is long, chunk it by tokens; else run directly
+        # 2) if the line is long, chunk it by tokens; else keep it as is
         ids = tokenizer.encode(line, add_special_tokens=False)
         if len(ids) <= max_no_special:
-            all_entities.extend(ner_pipeline(line))
+            segments.append(line)
         else:
             for start in range(0, len(ids), max_no_special):
                 chunk_ids = ids[start:start + max_no_special]
-                chunk_text = tokenizer.decode(chunk_ids, skip_special_tokens=True)
-                all_entities.extend(ner_pipeline(chunk_text))
+                segments.append(tokenizer.decode(chunk_ids, skip_special_tokens=True))
+
+    if not segments:
+        return []
+
+    # inference only: no autograd bookkeeping for any tensor created below
+    with torch.inference_mode():
+        # 3) long inputs: run the model directly instead of through the pipeline
+        if len(text) > FAST_PATH_MIN_CHARS:
+            all_entities = predict_entities_fast(segments, ner_pipeline.model, tokenizer)
+
+        # 4) otherwise run all segments through the pipeline in batches (one result list per segment, in order)
+        else:
+            all_entities = [entity for entities in ner_pipeline(segments) for entity in entities]
 
     skills = merge_bio_entities(all_entities)
 
-    return skills
\ No newline at end of file
+    return skills
+
+
+# Run the model once per batch of segments and build the same per-token entities as the
+# pipeline with numpy (softmax, argmax and filtering of special / "O" tokens)
+def predict_entities_fast(segments, model, tokenizer, batch_size=16):
+    # label names indexed by label id, so predicted ids can be mapped with numpy indexing
+    id2label = model.config.id2label
+    label_names = np.array([id2label[i] for i in range(len(id2label))])
+    all_entities = []
+
+    for start in range(0, len(segments), batch_size):
+        batch = segments[start:start + batch_size]
+
+        enc = tokenizer(batch, return_special_tokens_mask=True, return_tensors="pt", truncation=True, padding=True)
+        special_tokens_mask = enc.pop("special_tokens_mask").numpy()
+
+        # same softmax as the pipeline's postprocessing
+        logits = model(**enc).logits.numpy()
+        shifted_exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        probs = shifted_exp / shifted_exp.sum(axis=-1, keepdims=True)
+        pred_ids = probs.argmax(axis=-1)
+        scores = probs.max(axis=-1)
+
+        for i in range(len(batch)):
+            tokens = tokenizer.convert_ids_to_tokens(enc["input_ids"][i].tolist())
+            all_entities.extend(predictions_to_entities(tokens, special_tokens_mask[i], pred_ids[i], scores[i], label_names))
+
+    return all_entities
@@ -1,15 +1,58 @@
+import os
 import tensorflow as tf
 
-def make_dataset(encodings, batch_size=16):
-    input_ids = [e["input_ids"] for e in encodings]
-    attention = [e["attention_mask"] for e in encodings]
-    labels = [e["labels"] for e in encodings]
-    weights = [e["label_mask"] for e in encodings]
+from utils.encoder import IGNORE_LABEL_ID
 
-    ds = tf.data.Dataset.from_tensor_slices(({"input_ids": input_ids, "attention_mask": attention}, labels, weights))
+# sequence length boundaries used to group examples of similar length (max_length is 256)
+# batches are padded up to boundary - 1, so every batch length is a multiple of 32
+# and XLA only has to compile one graph per bucket
+BUCKET_BOUNDARIES = [33, 65, 97, 129, 161, 193, 225, 257]
 
-    return ds.padded_batch(
-        batch_size,
-        padded_shapes=({"input_ids": [None], "attention_mask": [None]}, [None], [None]),
-        padding_values=({"input_ids": 0, "attention_mask": 0}, 0, 0.0)
-    ).prefetch(tf.data.AUTOTUNE)
\ No newline at end of file
+def make_dataset(encodings, batch_size=16, shuffle=False, cache_file=""):
+    # yield one encoded example at a time instead of copying everything into tensors up-front
+    def gen():
+        for e in encodings:
+            yield ({"input_ids": e["input_ids"], "attention_mask": e["attention_mask"]}, e["labels"])
+
+    ds = tf.data.Dataset.from_generator(
+        gen,
+        output_signature=(
+            {"input_ids": tf.TensorSpec(shape=[None], dtype=tf.int32),
+             "attention_mask": tf.TensorSpec(shape=[None], dtype=tf.int32)},
+            tf.TensorSpec(shape=[None], dtype=tf.int32)
+        )
+    )
+
+    # cache the encoded examples after the first epoch (in memory, or on disk if cache_file is given)
+    ds = ds.cache(cache_file)
+
+    # shuffle examples after the cache so every epoch gets a new order
+    if shuffle:
+        ds = ds.shuffle(buffer_size=len(encodings), reshuffle_each_iteration=True)
+
+    # batch examples of similar length together so less compute is spent on padding tokens
+    # (padded label positions get IGNORE_LABEL_ID, like DataCollatorForTokenClassification does)
+    ds = ds.bucket_by_sequence_length(
+        element_length_func=lambda x, y: tf.shape(x["input_ids"])[0],
+        bucket_boundaries=BUCKET_BOUNDARIES,
+        bucket_batch_sizes=[batch_size] * (len(BUCKET_BOUNDARIES) + 1),
+        padded_shapes=({"input_ids": [None], "attention_mask": [None]}, [None]),
+        padding_values=({"input_ids": 0, "attention_mask": 0}, IGNORE_LABEL_ID),
+        pad_to_bucket_boundary=True
+    )
+
+    # sample weights so the compiled metrics (like the loss) skip ignored label positions
+    ds = ds.map(lambda x, y: (x, y, tf.cast(y != IGNORE_LABEL_ID, tf.float32)), num_parallel_calls=tf.data.AUTOTUNE)
+
+    # let tf.data fuse/parallelize the pipeline and not wait on slow elements to keep order
+    opts = tf.data.Options()
+    opts.deterministic = False
+    opts.experimental_optimization.map_and_batch_fusion = True
+    opts.experimental_optimization.map_parallelization = True
+    opts.experimental_optimization.parallel_batch = True
+    opts.threading.private_threadpool_size = os.cpu_count()
+    # when training on several replicas, split the batches (not input files) between them
+    opts.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.DATA
+    ds = ds.with_options(opts)
+
+    return ds.prefetch(tf.data.AUTOTUNE)
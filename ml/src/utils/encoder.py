@@ -1,31 +1,62 @@
+import numpy as np
+from numba import njit
+
+# Label id for tokens the loss and evaluation ignore (special tokens + extra subwords)
+IGNORE_LABEL_ID = -100
+
+# Compiled alignment loop: word_ids uses -1 for special tokens (None)
+@njit(cache=True, nogil=True)
+def _align(word_ids, tags):
+    labels = np.full(word_ids.shape[0], IGNORE_LABEL_ID, dtype=np.int32)
+    prev_word_id = -1
+
+    for i in range(word_ids.shape[0]):
+        word_id = word_ids[i]
+
+        # only the first subword of a word keeps its tag
+        if word_id != -1 and word_id != prev_word_id:
+            labels[i] = tags[word_id]
+
+        prev_word_id = word_id
+
+    return labels
+
+# compile once at import instead of on the first real example
+_align(np.array([-1, 0, 0, -1], dtype=np.int32), np.array([0], dtype=np.int32))
+
+# Align word-level BIO tags to the subword tokens of one example
+# Only the first subword of each word keeps its tag; the rest get IGNORE_LABEL_ID
+def align_labels(word_ids, tags):
+    word_ids = np.array([-1 if word_id is None else word_id for word_id in word_ids], dtype=np.int32)
+
+    return _align(word_ids, np.asarray(tags, dtype=np.int32))
+
+
 # Tokenize tokens (word-level) and align BIO labels to subword tokens
 # Uses -100 for tokens we want to ignore (special tokens + extra subwords)
 def tokenize_and_align_labels(tokenizer, tokens, tags):
     # tokenize the data
     tokenized = tokenizer(tokens, truncation=True, is_split_into_words=True, return_attention_mask=True, max_length=256)
-    
+
     word_ids = tokenized.word_ids() # For each token produced by the tokenizer -> original word that it came from
 
-    labels = []
-    mask = []
-    prev_word_id = None
+    tokenized['labels'] = align_labels(word_ids, tags)
 
-    for word_id in word_ids:
-        if word_id is None:
-            labels.append(0)
-            mask.append(0)
+    return tokenized
 
-        elif word_id != prev_word_id:
-            labels.append(tags[word_id])
-            mask.append(1)
 
-        else:
-            labels.append(0)
-            mask.append(0)
+# Same as tokenize_and_align_labels, but tokenizes all examples in one tokenizer call
+# (fast tokenizers encode the whole batch natively instead of once per example)
+def batch_tokenize_and_align_labels(tokenizer, tokens_list, tags_list):
+    tokenized = tokenizer(list(tokens_list), truncation=True, is_split_into_words=True, return_attention_mask=True, max_length=256, padding=False)
 
-        prev_word_id = word_id
-    
-    tokenized['labels'] = labels
-    tokenized['label_mask'] = mask
+    encodings = []
 
-    return tokenized
+    for i, tags in enumerate(tags_list):
+        encodings.append({
+            'input_ids': tokenized['input_ids'][i],
+            'attention_mask': tokenized['attention_mask'][i],
+            'labels': align_labels(tokenized.word_ids(batch_index=i), tags)
+        })
+
+    return encodings
@@ -1,38 +1,35 @@
+import numpy as np
 import tensorflow as tf
 from seqeval.metrics import classification_report, f1_score
 
+from utils.encoder import IGNORE_LABEL_ID
+
 # convert model outputs and true labels into seqeval-compatible format
 def get_seqeval_input(model, dataset, id2label):
     all_preds = []
     all_labels = []
 
+    # label names indexed by label id, so ids can be mapped with numpy indexing
+    labels_arr = np.array([id2label[i] for i in range(len(id2label))])
+
+    # forward pass + argmax as one compiled graph, so only the int32 predicted ids leave the device
+    @tf.function(jit_compile=True)
+    def _predict(input_ids, attention_mask):
+        logits = model({"input_ids": input_ids, "attention_mask": attention_mask}, training=False).logits
+        return tf.argmax(logits, axis=-1, output_type=tf.int32)
+
     for batch in dataset:
         input = batch[0]
         true_labels = batch[1]
-        weights = batch[2]
 
-        logits = model(input, training=False).logits
-        pred_ids = tf.argmax(logits, axis=-1).numpy()
+        pred_ids = _predict(input["input_ids"], input["attention_mask"]).numpy()
         label_ids = true_labels.numpy()
-        weights = weights.numpy()
+        mask = label_ids != IGNORE_LABEL_ID # ignore special tokens, extra subwords and padding
 
         for i in range(pred_ids.shape[0]):
-            preds, labels = [], []
-            
-            for j in range(pred_ids.shape[1]):
-
-                if weights[i, j] == 0:
-                    continue  # ignore masked tokens
-
-                preds.append(id2label[int(pred_ids[i, j])])
-                labels.append(id2label[int(label_ids[i, j])])
-
-            all_preds.append(preds)
-            all_labels.append(labels)
-            
-            all_preds.append(preds)
-            all_labels.append(labels)
-    
+            all_preds.append(labels_arr[pred_ids[i]][mask[i]].tolist())
+            all_labels.append(labels_arr[label_ids[i][mask[i]]].tolist())
+
     return all_preds, all_labels
 
 
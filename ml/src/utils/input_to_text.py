@@ -1,25 +1,23 @@
 import re, os, pypandoc, pdfplumber
 
+# patterns used by clean_cv_text, compiled once at import
+_NEWLINES = re.compile(r'\n+')
+_PAGE_NUMBERS = re.compile(r'page[ \t]+\d+[ \t]+of[ \t]+\d+', re.IGNORECASE)
+_SPACES_AND_BULLETS = re.compile(r'[ \t•●▪■–—]+')
+
 # clean extracted text from docx and pdfs
 def clean_cv_text(text):
-    # Convert all text to lowercase
-    text = text.lower()  
-
     # Replace multiple consecutive newlines with a single newline
-    text = re.sub(r'\n+', '\n', text)  
-    
-    # Keep line breaks, only normalize spaces/tabs
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{2,}", "\n", text) 
+    text = _NEWLINES.sub('\n', text)
 
     # Remove page number artifacts commonly found in CV footers
-    text = re.sub(r'page \d+ of \d+', '', text)  
+    text = _PAGE_NUMBERS.sub('', text)
 
-    # Remove bullet characters and long dashes
-    text = re.sub(r'[•●▪■–—]', ' ', text)  
+    # Keep line breaks, only collapse spaces/tabs and bullet characters/long dashes into a single space
+    text = _SPACES_AND_BULLETS.sub(' ', text)
 
-    # Remove leading and trailing whitespace before sending text to the ML model
-    return text.strip()  
+    # Convert all text to lowercase and remove leading and trailing whitespace before sending text to the ML model
+    return text.lower().strip()
 
 
 
@@ -40,13 +38,17 @@ def docx_to_text(filepath):
 
 # transform input from pdf to text
 def pdf_to_text(filepath):
-    text = ""
+    parts = []
 
+    # pages are parsed one at a time: they share the document's file stream, so they
+    # can't safely be extracted from several threads at once
     with pdfplumber.open(filepath) as pdf:
         for page in pdf.pages:
-            text += page.extract_text() or ""
+            parts.append(page.extract_text() or "")
+            page.close() # free the parsed layout objects of this page before the next one
 
-    return text
+    # join once at the end instead of rebuilding the string for every page
+    return "".join(parts)
 
 # exctract text from input (docx/pdf/txt)
 def extract_text(filepath):
@@ -1,3 +1,5 @@
+import numpy as np
+
 # Merge BIO entities -> I-skill + B-skill merged
 def merge_bio_entities(ner_output):
     skills = []
@@ -43,4 +45,13 @@ def merge_bio_entities(ner_output):
                        "score": sum(scores) / len(scores)
                     })
 
-    return skills
\ No newline at end of file
+    return skills
+
+
+
+# Per-token predictions -> pipeline-style entities (special/padding tokens and "O" dropped)
+def predictions_to_entities(tokens, special_tokens_mask, pred_ids, scores, label_names):
+    labels = label_names[pred_ids]
+    keep = np.nonzero((special_tokens_mask == 0) & (labels != "O"))[0]
+
+    return [{"word": tokens[i], "entity": labels[i], "score": scores[i]} for i in keep]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.utils.skills_postprocessing import predictions_to_entities
+
+LABEL_NAMES = np.array(["B", "I", "O"])
+
+# [CLS] node . js and tensor ##flow , python o sql [SEP] [PAD]
+TOKENS = ["[CLS]", "node", ".", "js", "and", "tensor", "##flow", ",", "python", "o", "sql", "[SEP]", "[PAD]"]
+SPECIAL_TOKENS_MASK = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1])
+PRED_IDS = np.array([2, 0, 1, 1, 2, 0, 1, 2, 0, 2, 1, 2, 2])
+SCORES = np.array([0.5, 0.9, 0.6, 0.8, 0.9, 0.7, 0.7, 0.9, 0.8, 0.9, 0.6, 0.5, 0.5], dtype=np.float32)
+
+
+def test_predictions_to_entities_drops_special_and_o_tokens():
+    entities = predictions_to_entities(TOKENS, SPECIAL_TOKENS_MASK, PRED_IDS, SCORES, LABEL_NAMES)
+
+    assert entities == [
+        {"word": "node", "entity": "B", "score": SCORES[1]},
+        {"word": ".", "entity": "I", "score": SCORES[2]},
+        {"word": "js", "entity": "I", "score": SCORES[3]},
+        {"word": "tensor", "entity": "B", "score": SCORES[5]},
+        {"word": "##flow", "entity": "I", "score": SCORES[6]},
+        {"word": "python", "entity": "B", "score": SCORES[8]},
+        {"word": "sql", "entity": "I", "score": SCORES[10]},
+    ]
+
+
+def test_predict_entities_fast_matches_pipeline(tmp_path):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    from src.services.skills_extraction import build_skill_pipeline, predict_entities_fast
+
+    # tiny randomly initialised BERT token classifier with a word-piece vocab
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "node", ".", "js", "and", "tensor", "##flow",
+             ",", "python", "sql", "docker", "with", "experience", "in", "machine", "learning"]
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1,
+                                     num_attention_heads=2, intermediate_size=32, num_labels=3,
+                                     id2label={0: "B", 1: "I", 2: "O"}, label2id={"B": 0, "I": 1, "O": 2})
+    model = transformers.BertForTokenClassification(config).eval()
+    # spread the logits so the random model predicts a mix of B / I / O
+    torch.nn.init.normal_(model.classifier.weight, std=1.0)
+
+    segments = ["experience in python , sql and docker",
+                "node . js with tensorflow",
+                "machine learning",
+                "python"]
+
+    ner = build_skill_pipeline(model, tokenizer, batch_size=2)
+
+    with torch.inference_mode():
+        fast_entities = predict_entities_fast(segments, model, tokenizer, batch_size=2)
+        pipeline_entities = [entity for entities in ner(segments) for entity in entities]
+
+    assert pipeline_entities
+    assert [(e["word"], e["entity"]) for e in fast_entities] == [(e["word"], e["entity"]) for e in pipeline_entities]
+    np.testing.assert_allclose([e["score"] for e in fast_entities], [e["score"] for e in pipeline_entities], rtol=1e-5)